@@ -7,9 +7,84 @@ from semantic_kernel.contents import ChatMessageContent
 from semantic_kernel.prompt_template import InputVariable
 # import tiktoken  # Optional - install with: pip install tiktoken
 import json
-from skills.graph_api_request_simplified import GraphAPIRequestSkill
+import hashlib
+import logging
+import time
+from skills.graph_api_request import GraphAPIRequestSkill, _loads
 from config.date_helper import enhance_prompt_with_date
 
+logger = logging.getLogger(__name__)
+
+
+# In-memory TTL cache for Graph GET responses. Graph reads are effectively
+# static on sub-minute timescales, so repeat queries (same api_path) can skip
+# the round-trip entirely. Error responses are never cached.
+_GRAPH_CACHE_TTL = 60  # seconds
+_GRAPH_CACHE_MAX_SIZE = 1024
+_graph_response_cache = {}
+
+
+def _graph_cache_key(api_path: str, fetch_all: bool, consistency_level) -> str:
+    return hashlib.sha256(f"{api_path}|{fetch_all}|{consistency_level}".encode()).hexdigest()
+
+
+def _extract_result_json(response_str: str):
+    """Parse the JSON payload out of the skill's "Result for Graph API" wrapper
+
+    The wrapper can append a pagination note after the JSON, so slice from
+    the first opening to the last closing brace before parsing. Returns None
+    when the response carries no JSON object.
+    """
+    start = response_str.find('{')
+    end = response_str.rfind('}')
+    if start < 0 or end < start:
+        return None
+    return _loads(response_str[start:end + 1])
+
+
+async def _cached_graph_get(kernel: Kernel, graph_request, api_path: str, fetch_all: bool = False, consistency_level: str = None) -> str:
+    """Invoke the Graph GET skill with a short-lived response cache"""
+    key = _graph_cache_key(api_path, fetch_all, consistency_level)
+    now = time.time()
+
+    entry = _graph_response_cache.get(key)
+    if entry and now - entry[0] < _GRAPH_CACHE_TTL:
+        return entry[1]
+
+    result = await kernel.invoke(
+        graph_request,
+        KernelArguments(
+            api_path=api_path,
+            method="GET",
+            fetch_all=fetch_all,
+            consistency_level=consistency_level,
+            query_params={},
+            body={}
+        )
+    )
+    response_str = str(result)
+
+    # Never cache error responses - they come back as plain JSON with an "error" key
+    cacheable = True
+    try:
+        parsed = _loads(response_str)
+        if isinstance(parsed, dict) and "error" in parsed:
+            cacheable = False
+    except (json.JSONDecodeError, ValueError):
+        pass  # Wrapped success responses are not pure JSON - cache them
+
+    if cacheable:
+        if len(_graph_response_cache) >= _GRAPH_CACHE_MAX_SIZE:
+            # Drop expired entries; clear completely if still oversized
+            expired = [k for k, v in _graph_response_cache.items() if now - v[0] >= _GRAPH_CACHE_TTL]
+            for k in expired:
+                del _graph_response_cache[k]
+            if len(_graph_response_cache) >= _GRAPH_CACHE_MAX_SIZE:
+                _graph_response_cache.clear()
+        _graph_response_cache[key] = (now, response_str)
+
+    return response_str
+
 
 def build_kernel() -> Kernel:
     """Build and configure the Semantic Kernel instance"""
@@ -250,9 +325,10 @@ Assistent:"""
             "rechte", "berechtigungen", "permissions", "zugeteilte rechte", "liste", "app registrierung"
         ]) and any(keyword in user_query.lower() for keyword in ["app", "anwendung", "registrierung"])
         
-        print(f"DEBUG: App permissions query check: {is_app_permissions_query}")
-        print(f"DEBUG: Query contains rechte keywords: {[k for k in ['rechte', 'berechtigungen', 'permissions', 'zugeteilte rechte', 'liste', 'app registrierung'] if k in user_query.lower()]}")
-        print(f"DEBUG: Query contains app keywords: {[k for k in ['app', 'anwendung', 'registrierung'] if k in user_query.lower()]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("App permissions query check: %s", is_app_permissions_query)
+            logger.debug("Query contains rechte keywords: %s", [k for k in ['rechte', 'berechtigungen', 'permissions', 'zugeteilte rechte', 'liste', 'app registrierung'] if k in user_query.lower()])
+            logger.debug("Query contains app keywords: %s", [k for k in ['app', 'anwendung', 'registrierung'] if k in user_query.lower()])
         
         if is_app_permissions_query:
             # Multi-query approach like Lokka
@@ -282,7 +358,7 @@ Assistent:"""
     
         # Step 2: Execute Graph API request with retry mechanism
         max_retries = 3
-        api_response = None
+        api_response_str = None
         
         for attempt in range(max_retries):
             if step_callback:
@@ -299,21 +375,15 @@ Assistent:"""
                 consistency_level = "eventual"
             
             graph_request = kernel.get_function("GraphAPIRequest", "execute_graph_request")
-            api_response = await kernel.invoke(
-                graph_request,
-                KernelArguments(
-                    api_path=api_path,
-                    method="GET",
-                    fetch_all=fetch_all,
-                    consistency_level=consistency_level,
-                    query_params={},
-                    body={}
-                )
+            api_response_str = await _cached_graph_get(
+                kernel, graph_request, api_path,
+                fetch_all=fetch_all,
+                consistency_level=consistency_level
             )
-            
+
             # Check if response contains an error
             try:
-                response_data = json.loads(str(api_response))
+                response_data = _loads(api_response_str)
                 # Check for API errors (status_code >= 400) or general errors
                 has_error = ("error" in response_data and 
                            (response_data.get("status_code", 0) >= 400 or 
@@ -333,14 +403,14 @@ Assistent:"""
                                 original_query=user_query,
                                 failed_url=api_path,
                                 error_message=error_message,
-                                error_response=str(api_response)
+                                error_response=api_response_str
                             )
                         )
                         
                         corrected_api_path = str(corrected_url_result).strip()
                         if corrected_api_path and corrected_api_path != api_path:
                             # Track tokens for error correction - this is another LLM call
-                            error_prompt_content = f"Du bist ein Experte für Microsoft Graph API Fehlerkorrektur.\nAnalysiere den Fehler und korrigiere die API-URL.\n\nUrsprüngliche Anfrage: {user_query}\nFehlgeschlagene URL: {api_path}\nFehlermeldung: {error_message}\nFehlerdetails: {str(api_response)}"
+                            error_prompt_content = f"Du bist ein Experte für Microsoft Graph API Fehlerkorrektur.\nAnalysiere den Fehler und korrigiere die API-URL.\n\nUrsprüngliche Anfrage: {user_query}\nFehlgeschlagene URL: {api_path}\nFehlermeldung: {error_message}\nFehlerdetails: {api_response_str}"
                             error_prompt_tokens = estimate_tokens(error_prompt_content)
                             error_response_tokens = estimate_tokens(corrected_api_path)
                             error_total_tokens = error_prompt_tokens + error_response_tokens
@@ -369,24 +439,24 @@ Assistent:"""
         
         if step_callback:
             # Truncate response for display
-            response_preview = str(api_response)[:500] + "..." if len(str(api_response)) > 500 else str(api_response)
+            response_preview = api_response_str[:500] + "..." if len(api_response_str) > 500 else api_response_str
             # API calls don't use LLM tokens, just network/processing
             step_callback("API Response", f"{response_preview}|||0")
-        
+
         # Step 3: Summarize the response
         summarizer = kernel.get_function("summarizer", "Summarizer")
         summary = await kernel.invoke(
             summarizer,
             KernelArguments(
                 question=user_query,
-                apiResponse=str(api_response)
+                apiResponse=api_response_str
             )
         )
         
         final_response = str(summary)
         
         # Track tokens for summarization - this is another major LLM call
-        summary_prompt_content = f"Du bist ein präziser Assistent für Microsoft Graph API Abfragen.\n\nOriginalfrage: {user_query}\nAPI-Antwort: {str(api_response)}\n\nWICHTIG: Beantworte NUR die gestellte Frage. Sei KURZ und PRÄZISE.\n\nRegeln:\n- Bei \"Wie viele...?\": Antworte nur mit der Zahl (z.B. \"18 Benutzer\")\n- Bei \"Aktivitätsfragen: Nenne Benutzer, Aktion und App/Service\n- Bei \"was hat er gemacht\": Liste die wichtigsten Aktionen auf\n- Bei Fehlern: Erkläre kurz das Problem\n- KEINE unnötigen Details oder lange Listen"
+        summary_prompt_content = f"Du bist ein präziser Assistent für Microsoft Graph API Abfragen.\n\nOriginalfrage: {user_query}\nAPI-Antwort: {api_response_str}\n\nWICHTIG: Beantworte NUR die gestellte Frage. Sei KURZ und PRÄZISE.\n\nRegeln:\n- Bei \"Wie viele...?\": Antworte nur mit der Zahl (z.B. \"18 Benutzer\")\n- Bei \"Aktivitätsfragen: Nenne Benutzer, Aktion und App/Service\n- Bei \"was hat er gemacht\": Liste die wichtigsten Aktionen auf\n- Bei Fehlern: Erkläre kurz das Problem\n- KEINE unnötigen Details oder lange Listen"
         summary_prompt_tokens = estimate_tokens(summary_prompt_content)
         summary_response_tokens = estimate_tokens(final_response)
         summary_total_tokens = summary_prompt_tokens + summary_response_tokens
@@ -415,7 +485,7 @@ async def process_app_permissions_query(kernel: Kernel, user_query: str, step_ca
     try:
         # Extract app name from query
         app_name = extract_app_name_from_query(user_query)
-        print(f"DEBUG Multi-Query: Extracted app_name: '{app_name}' from query: '{user_query}'")
+        logger.debug("Multi-Query: Extracted app_name: '%s' from query: '%s'", app_name, user_query)
         
         if not app_name:
             return "❌ Konnte den App-Namen aus der Anfrage nicht extrahieren."
@@ -431,36 +501,22 @@ async def process_app_permissions_query(kernel: Kernel, user_query: str, step_ca
         if step_callback:
             step_callback("Query 1/3", f"App-Details abrufen: {app_query}|||0")
         
-        app_response = await kernel.invoke(
-            graph_request,
-            KernelArguments(
-                api_path=app_query,
-                method="GET",
-                fetch_all=False,
-                consistency_level=None,
-                query_params={},
-                body={}
-            )
-        )
-        
+        response_str = await _cached_graph_get(kernel, graph_request, app_query)
+
         # Parse app response
         try:
-            print(f"DEBUG Multi-Query: Raw app response: {str(app_response)[:500]}")
-            
-            # Handle the wrapped response format from our simplified skill
-            response_str = str(app_response)
+            logger.debug("Multi-Query: Raw app response: %.500s", response_str)
             if "Result for Graph API v1.0" in response_str:
-                # Extract JSON from our formatted response
-                json_start = response_str.find('{')
-                if json_start > 0:
-                    json_content = response_str[json_start:]
-                    app_data = json.loads(json_content)
-                else:
+                # Extract JSON from our formatted response (the wrapper may
+                # append a pagination note after the payload)
+                app_data = _extract_result_json(response_str)
+                if app_data is None:
                     return f"❌ Keine JSON-Daten in der App-Response gefunden."
             else:
-                app_data = json.loads(response_str)
+                app_data = _loads(response_str)
             
-            print(f"DEBUG Multi-Query: Parsed app_data keys: {list(app_data.keys()) if isinstance(app_data, dict) else 'Not a dict'}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Multi-Query: Parsed app_data keys: %s", list(app_data.keys()) if isinstance(app_data, dict) else 'Not a dict')
             
             if "value" not in app_data or not app_data["value"]:
                 return f"❌ App '{app_name}' nicht gefunden. (Gefundene Keys: {list(app_data.keys()) if isinstance(app_data, dict) else 'Keine'})"
@@ -468,13 +524,13 @@ async def process_app_permissions_query(kernel: Kernel, user_query: str, step_ca
             app_info = app_data["value"][0]
             required_resource_access = app_info.get("requiredResourceAccess", [])
             
-            print(f"DEBUG Multi-Query: App gefunden: {app_info.get('displayName')}, Berechtigungen: {len(required_resource_access)}")
+            logger.debug("Multi-Query: App gefunden: %s, Berechtigungen: %s", app_info.get('displayName'), len(required_resource_access))
             
             if not required_resource_access:
                 return f"✅ Die App '{app_name}' hat keine spezifischen API-Berechtigungen konfiguriert."
             
         except Exception as e:
-            return f"❌ Fehler beim Parsen der App-Daten: {str(e)}. Raw response: {str(app_response)[:200]}"
+            return f"❌ Fehler beim Parsen der App-Daten: {str(e)}. Raw response: {response_str[:200]}"
         
         # Step 2: Get Microsoft Graph ServicePrincipal for permission name mapping
         if step_callback:
@@ -482,36 +538,22 @@ async def process_app_permissions_query(kernel: Kernel, user_query: str, step_ca
         
         graph_sp_query = "/servicePrincipals?$filter=appId eq '00000003-0000-0000-c000-000000000000'&$select=id,displayName,appRoles,oauth2PermissionScopes"
         
-        graph_sp_response = await kernel.invoke(
-            graph_request,
-            KernelArguments(
-                api_path=graph_sp_query,
-                method="GET",
-                fetch_all=False,
-                consistency_level=None,
-                query_params={},
-                body={}
-            )
-        )
-        
+        sp_response_str = await _cached_graph_get(kernel, graph_request, graph_sp_query)
+
         # Parse ServicePrincipal response
         try:
-            print(f"DEBUG Multi-Query: Raw SP response: {str(graph_sp_response)[:500]}")
-            
-            # Handle the wrapped response format from our simplified skill
-            sp_response_str = str(graph_sp_response)
+            logger.debug("Multi-Query: Raw SP response: %.500s", sp_response_str)
             if "Result for Graph API v1.0" in sp_response_str:
-                # Extract JSON from our formatted response
-                json_start = sp_response_str.find('{')
-                if json_start > 0:
-                    json_content = sp_response_str[json_start:]
-                    sp_data = json.loads(json_content)
-                else:
+                # Extract JSON from our formatted response (the wrapper may
+                # append a pagination note after the payload)
+                sp_data = _extract_result_json(sp_response_str)
+                if sp_data is None:
                     return f"❌ Keine JSON-Daten in der ServicePrincipal-Response gefunden."
             else:
-                sp_data = json.loads(sp_response_str)
+                sp_data = _loads(sp_response_str)
             
-            print(f"DEBUG Multi-Query: Parsed sp_data keys: {list(sp_data.keys()) if isinstance(sp_data, dict) else 'Not a dict'}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Multi-Query: Parsed sp_data keys: %s", list(sp_data.keys()) if isinstance(sp_data, dict) else 'Not a dict')
             
             if "value" not in sp_data or not sp_data["value"]:
                 return "❌ Microsoft Graph ServicePrincipal nicht gefunden."
@@ -520,7 +562,7 @@ async def process_app_permissions_query(kernel: Kernel, user_query: str, step_ca
             app_roles = graph_sp.get("appRoles", [])
             oauth2_scopes = graph_sp.get("oauth2PermissionScopes", [])
             
-            print(f"DEBUG Multi-Query: Found {len(app_roles)} app roles and {len(oauth2_scopes)} OAuth2 scopes")
+            logger.debug("Multi-Query: Found %s app roles and %s OAuth2 scopes", len(app_roles), len(oauth2_scopes))
             
             # Build permission mapping
             permission_mapping = {}
@@ -539,7 +581,7 @@ async def process_app_permissions_query(kernel: Kernel, user_query: str, step_ca
                 }
                 
         except Exception as e:
-            return f"❌ Fehler beim Parsen der ServicePrincipal-Daten: {str(e)}. Raw SP response: {str(graph_sp_response)[:200]}"
+            return f"❌ Fehler beim Parsen der ServicePrincipal-Daten: {str(e)}. Raw SP response: {sp_response_str[:200]}"
         
         # Step 3: Translate permissions to human-readable names
         if step_callback:
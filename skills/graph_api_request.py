@@ -1,10 +1,233 @@
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 from azure.identity import ClientSecretCredential
 from msgraph import GraphServiceClient
+import aiohttp
+import asyncio
+import collections
+import dataclasses
+import enum
+import functools
 import json
 import logging
+import operator
+import os
+import random
+import re
+import time
 from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from uuid import UUID
 from msgraph.generated.models.o_data_errors.o_data_error import ODataError
+from msgraph.generated.models.user import User
+from msgraph.generated.models.group import Group
+from msgraph.generated.models.application import Application
+from msgraph.generated.models.service_principal import ServicePrincipal
+from msgraph.generated.models.conditional_access_policy import ConditionalAccessPolicy
+from msgraph.generated.models.directory_role import DirectoryRole
+from msgraph.generated.applications.applications_request_builder import ApplicationsRequestBuilder
+from msgraph.generated.groups.groups_request_builder import GroupsRequestBuilder
+from msgraph.generated.identity.conditional_access.policies.policies_request_builder import PoliciesRequestBuilder
+from msgraph.generated.service_principals.service_principals_request_builder import ServicePrincipalsRequestBuilder
+from msgraph.generated.users.users_request_builder import UsersRequestBuilder
+from kiota_abstractions.serialization import Parsable
+
+# orjson is a C-implemented JSON encoder, 3-10x faster than stdlib json, and
+# serializes datetime natively. Optional - install with: pip install orjson
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(data, pretty: bool = False) -> str:
+    """Serialize to JSON, preferring orjson when installed
+
+    Compact by default - pretty-printing pads every response with
+    whitespace that the model then has to read back as tokens.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(data, option=option, default=str).decode()
+    if pretty:
+        return json.dumps(data, indent=2, default=str)
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def _loads(text):
+    """Parse JSON, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+# Advanced queries ($count/$filter/$search/$orderby, conditional access) need
+# the ConsistencyLevel: eventual header - one compiled regex scan per request
+# instead of five separate substring checks.
+_NEEDS_CONSISTENCY = re.compile(r"\$(?:count|filter|search|orderby)|conditionalAccess")
+
+
+@functools.lru_cache(maxsize=256)
+def _path_head(api_path: str) -> str:
+    """First path segment of a normalized api_path, memoized - agent loops
+    repeat the same handful of paths, so the split runs once per distinct one"""
+    return api_path.split("/", 1)[0].split("?", 1)[0]
+
+
+@dataclasses.dataclass(slots=True)
+class RequestLog:
+    """One request-history entry. Slots keep the per-request allocation small
+    compared to a dict - these pile up under heavy pagination.
+
+    timestamp_ns is a time.time_ns() epoch value; format it for display only
+    when an entry is actually rendered.
+    """
+    timestamp_ns: int
+    method: str
+    api_path: str
+    fetch_all: bool
+    consistency_level: str | None
+    sdk_version: str
+    status_code: int | None = None
+    response_items: int = 0
+    error: str | None = None
+
+
+# Permission GUID -> human-readable name tables, built once at import instead
+# of reconstructed per analysis. Earlier revisions had several GUID keys
+# twice, silently overwriting each other at dict-build time; each GUID now
+# appears exactly once with its documented meaning.
+
+# Microsoft Graph API permissions (most common ones)
+_MS_GRAPH_PERMS = {
+    # User permissions
+    "e1fe6dd8-ba31-4d61-89e7-88639da4683d": "User.Read",
+    "b340eb25-3456-403f-be2f-af7a0d370277": "User.ReadBasic.All",
+    "df021288-bdef-4463-88db-98f22de89214": "User.Read.All",
+    "204e0828-b5ca-4ad8-b9f3-f32a958e7cc4": "User.ReadWrite.All",
+
+    # Directory permissions
+    "7ab1d382-f21e-4acd-a863-ba3e13f7da61": "Directory.Read.All",
+    "06da0dbc-49e2-44d2-8312-53f166ab848a": "Directory.Read.All",
+    "19dbc75e-c2e2-444c-a770-ec69d8559fc7": "Directory.ReadWrite.All",
+    "c5366453-9fb0-48a5-a156-24f0c49a4b84": "Directory.ReadWrite.All",
+    "483bed4a-2ad3-4361-a73b-c83ccdbdc53c": "Directory.AccessAsUser.All",
+
+    # Group permissions
+    "5f8c59db-677d-491f-a6b8-5f174b11ec1d": "Group.Read.All",
+    "5b567255-7703-4780-807c-7be8301ae99b": "Group.Read.All",
+    "62a82d76-70ea-41e2-9197-370581804d09": "Group.ReadWrite.All",
+    "4e46008b-f24c-477d-8fff-7bb4ec7aafe0": "Group.ReadWrite.All",
+
+    # Application permissions
+    "9a5d68dd-52b0-4cc2-bd40-abcf44ac3a30": "Application.Read.All",
+    "1bfefb4e-e0b5-418b-a88f-73c46d2cc8e9": "Application.Read.All",
+    "1cda74f2-2616-4834-b122-5cb1b07f8a59": "Application.ReadWrite.All",
+
+    # Policy permissions
+    "246dd0d5-5bd0-4def-940b-0421030a5b68": "Policy.Read.All",
+    "40b534c3-9552-4550-901b-23879c90bcf9": "Policy.ReadWrite.ConditionalAccess",
+
+    # Device permissions
+    "06a5fe6d-c49d-46a7-b082-56b1b14103c7": "Device.Read.All",
+    "7438b122-aefc-4978-80ed-43db9fcc7715": "Device.Read.All",
+    "1138cb37-bd11-4084-a2b7-9f71582aeddb": "Device.ReadWrite.All",
+
+    # Device Management (Intune) permissions
+    "dc377aa6-52d8-4e23-b271-2a7ae04cedf3": "DeviceManagementManagedDevices.Read.All",
+    "b0afded3-3588-46d8-8b3d-9842eff778da": "DeviceManagementManagedDevices.ReadWrite.All",
+
+    # Mail permissions
+    "810c84a8-4a9e-49e6-bf7d-12d183f40d01": "Mail.Read",
+    "693c5e45-0940-467d-9b8a-1022fb9d42ef": "Mail.ReadWrite",
+
+    # Calendar permissions
+    "465a38f9-76ea-45b9-9f34-9e8b0d4b0b42": "Calendars.Read",
+    "1ec239c2-d7c9-4623-a91a-a9775856bb36": "Calendars.ReadWrite",
+
+    # Files permissions
+    "df85f4d6-205c-4ac5-a5ea-6bf408dba283": "Files.Read.All",
+    "75359482-378d-4052-8f01-80520e7db3cd": "Files.ReadWrite.All",
+
+    # Sites permissions
+    "332a536c-c7ef-4017-ab91-336970924f0d": "Sites.Read.All",
+    "9492366f-7969-46a4-8d15-ed1a20078fff": "Sites.ReadWrite.All",
+
+    # Reports permissions
+    "230c1aed-a721-4c5d-9cb4-a90514e508ef": "Reports.Read.All",
+}
+
+# Azure Active Directory Graph permissions (legacy, but still used)
+_AAD_GRAPH_PERMS = {
+    "5778995a-e1bf-45b8-affa-663a9f3f4d04": "Directory.Read.All",
+    "78c8a3c8-a07e-4b9e-af1b-b5ccab50a175": "Directory.ReadWrite.All",
+    "824c81eb-e3f8-4ee6-8f6d-de7f50d565b7": "Application.ReadWrite.OwnedBy",
+}
+
+_PERMISSION_MAPPINGS = {
+    "00000003-0000-0000-c000-000000000000": {  # Microsoft Graph
+        "name": "Microsoft Graph",
+        "permissions": _MS_GRAPH_PERMS
+    },
+    "00000002-0000-0000-c000-000000000000": {  # Azure Active Directory Graph
+        "name": "Azure Active Directory Graph",
+        "permissions": _AAD_GRAPH_PERMS
+    }
+}
+
+# Reverse indexes over the permission tables, built once at import. Grant
+# matching does a single hash lookup per appRoleId/scope name instead of
+# scanning every API's permission dict per grant. Keys are the GUIDs as
+# 128-bit ints - hashing and comparing a machine word beats doing it over
+# a fresh 36-char string from JSON every time.
+_ID_TO_API_PERM = {
+    UUID(perm_id).int: (api_info["name"], perm_name)
+    for api_info in _PERMISSION_MAPPINGS.values()
+    for perm_id, perm_name in api_info["permissions"].items()
+}
+
+
+def _build_name_index() -> dict:
+    """Build permission name -> [(api, name, id), ...] (names are not unique across APIs)"""
+    index = {}
+    for api_info in _PERMISSION_MAPPINGS.values():
+        for perm_id, perm_name in api_info["permissions"].items():
+            index.setdefault(perm_name, []).append((api_info["name"], perm_name, perm_id))
+    return index
+
+
+_NAME_TO_API_PERM = _build_name_index()
+
+# Static URL parts and @odata.context strings, built once at import time
+# instead of re-formatting them on every call
+_GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+_BATCH_URL = _GRAPH_BASE + "/$batch"
+_USER_COUNT_URL = _GRAPH_BASE + "/users/$count"
+_CONTEXT = {entity: f"{_GRAPH_BASE}/$metadata#{entity}" for entity in (
+    "users", "groups", "applications", "servicePrincipals",
+    "identity/conditionalAccess/policies",
+)}
+
+# Static part of the REST request headers - only Authorization (and an
+# occasional ConsistencyLevel) varies per request
+_BASE_HEADERS = {"Content-Type": "application/json"}
+
+# Pre-redacted counterpart for debug logging: Authorization is the only
+# sensitive header, so no per-request redaction pass is needed
+_REDACTED_HEADERS = {**_BASE_HEADERS, "Authorization": "***"}
+
+# C-implemented field extractors for the hot serializers - one attrgetter
+# call returns all fields as a tuple instead of n attribute lookups per
+# object, which adds up on fetch_all over large tenants
+_USER_FIELDS = operator.attrgetter("id", "display_name", "user_principal_name", "mail", "account_enabled", "created_date_time")
+_GROUP_FIELDS = operator.attrgetter("id", "display_name", "description", "mail", "group_types")
+_SP_FIELDS = operator.attrgetter("id", "app_id", "display_name", "service_principal_type", "account_enabled")
+_DIRECTORY_ROLE_FIELDS = operator.attrgetter("id", "display_name", "description", "role_template_id")
+
+# Server-side $select projections mirroring the serializer field lists -
+# the serializers drop everything else anyway, so asking Graph for only
+# these fields cuts response bytes by roughly 5-10x on big collections
+_USER_SELECT = ["id", "displayName", "userPrincipalName", "mail", "accountEnabled", "createdDateTime"]
+_GROUP_SELECT = ["id", "displayName", "description", "mail", "groupTypes"]
+_CA_POLICY_SELECT = ["id", "displayName", "state", "createdDateTime", "modifiedDateTime"]
 
 
 class GraphAPIRequestSkill:
@@ -15,7 +238,10 @@ class GraphAPIRequestSkill:
         self.client_id = client_id
         self.client_secret = client_secret
         self.logger = logging.getLogger(__name__)
-        self.request_history = []
+        # Ring buffer: old entries are evicted in O(1) so the history can't
+        # grow without bound in a long-running chat session. Only populated
+        # when debug logging is enabled.
+        self.request_history = collections.deque(maxlen=int(os.getenv("GRAPH_HISTORY_MAX", "200")))
         
         # Initialize Azure Credential (synchronous version for SDK)
         self._credential = ClientSecretCredential(
@@ -24,25 +250,409 @@ class GraphAPIRequestSkill:
             client_secret=client_secret
         )
         
-        # Initialize Graph Service Client
-        self.graph_client = GraphServiceClient(
-            credentials=self._credential,
-            scopes=["https://graph.microsoft.com/.default"]
+        # Initialize Graph Service Client (HTTP/2 transport when available)
+        self.graph_client = self._build_graph_client()
+
+        # Shared aiohttp session for REST fallbacks, created lazily on first use.
+        # Reusing one pooled session keeps connections alive instead of paying a
+        # TCP+TLS handshake per request.
+        self._session = None
+        self._session_lock = asyncio.Lock()
+
+        # Loop the session/locks/semaphore were created under. Streamlit runs
+        # every chat turn in its own asyncio.run() loop while the skill lives
+        # on in session_state, so these loop-bound primitives must be rebuilt
+        # whenever the running loop changes (see _bind_to_running_loop).
+        self._loop = None
+
+        # Cap concurrent outbound REST calls - enough to overlap latency on
+        # fan-outs without immediately tripping Graph throttling. Tunable
+        # per deployment, since throttling budgets are per app + tenant.
+        self._max_concurrency = int(os.getenv("GRAPH_MAX_CONCURRENCY", "16"))
+        self._request_semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        # TTL cache for idempotent GETs: repeated identical reads in an agent
+        # loop become memory hits instead of Graph round-trips. TTL depends
+        # on how volatile the entity is; writes invalidate by path prefix.
+        self._response_cache = {}
+        self._cache_ttls = {
+            "users": 3600,
+            "groups": 3600,
+            "servicePrincipals": 3600,
+            "applications": 3600,
+            "identity/conditionalAccess/policies": 300,
+        }
+        self._default_cache_ttl = 300
+
+        # Delta-query state per collection: the deltaLink from the last sync
+        # plus the serialized snapshot it produced, so repeated fetch_all
+        # listings only transfer the objects that changed since
+        self._delta_links = {}
+        self._delta_snapshots = {}
+
+        # Cached Graph access token as (token string, expires_on epoch seconds).
+        # Tokens are valid ~1h, so hitting the token endpoint per request is
+        # pure overhead on the hot path.
+        self._token_cache = None
+        self._token_lock = asyncio.Lock()
+        # Pre-composed "Bearer <token>" header value, rebuilt on token refresh
+        self._auth_header = None
+
+        # In-flight request futures keyed by (api_path, fetch_all,
+        # consistency_level) so concurrent identical calls share one Graph
+        # round-trip instead of each going to the wire
+        self._inflight = {}
+
+        # Explicit serializers for known SDK models. Dispatching by type avoids
+        # the expensive dir()/getattr reflection walk per object; unknown model
+        # types still fall back to the reflective path in _object_to_dict.
+        self._serializers = {
+            User: self._serialize_user,
+            Group: self._serialize_group,
+            Application: self._serialize_application,
+            ServicePrincipal: self._serialize_service_principal,
+            ConditionalAccessPolicy: self._serialize_ca_policy,
+            DirectoryRole: self._serialize_directory_role,
+        }
+
+        # O(1) endpoint dispatch keyed on the first path segment - one
+        # dict.get per request instead of scanning a list of patterns, and
+        # no ordering bugs when handlers are added. Endpoints that only
+        # appear deeper in the path (conditional access lives under
+        # identity/) are matched by substring as a fallback.
+        self._routes = {
+            "users": self._route_users,
+            "applications": self._route_applications,
+            "servicePrincipals": self._route_service_principals,
+            "groups": self._route_groups,
+            "directoryRoles": self._route_directory_roles,
+        }
+        self._substring_routes = (
+            ("conditionalAccess/policies", self._route_conditional_access),
         )
-    
+
+    def _build_graph_client(self) -> GraphServiceClient:
+        """Build the Graph SDK client, preferring an HTTP/2 transport
+
+        HTTP/2 multiplexes concurrent Graph calls over a single TCP+TLS
+        connection instead of opening one per request. Needs the optional
+        h2 package (pip install httpx[http2]) - without it the SDK's
+        default HTTP/1.1 transport is used.
+        """
+        scopes = ["https://graph.microsoft.com/.default"]
+        try:
+            import httpx
+            from msgraph_core import GraphClientFactory
+            from msgraph import GraphRequestAdapter
+            from kiota_authentication_azure.azure_identity_authentication_provider import AzureIdentityAuthenticationProvider
+
+            # httpx raises ImportError here when h2 is not installed
+            http_client = GraphClientFactory.create_with_default_middleware(
+                client=httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+                )
+            )
+            auth_provider = AzureIdentityAuthenticationProvider(self._credential, scopes=scopes)
+            adapter = GraphRequestAdapter(auth_provider, http_client)
+            return GraphServiceClient(request_adapter=adapter)
+        except ImportError:
+            self.logger.info("HTTP/2 transport not available (install httpx[http2]), using SDK default")
+            return GraphServiceClient(credentials=self._credential, scopes=scopes)
+
+    async def _get_token(self) -> str:
+        """Return a cached Graph access token, refreshing when close to expiry"""
+        now = time.time()
+        cached = self._token_cache
+        if cached and cached[1] - now > 300:
+            return cached[0]
+
+        # Refresh under a lock so concurrent requests don't all hit the token endpoint
+        async with self._token_lock:
+            # Re-read the clock: another waiter may have refreshed while we
+            # queued for the lock, and the pre-lock timestamp is stale
+            cached = self._token_cache
+            if cached and cached[1] - time.time() > 300:
+                return cached[0]
+
+            token_result = self._credential.get_token("https://graph.microsoft.com/.default")
+            self._token_cache = (token_result.token, token_result.expires_on)
+            self._auth_header = "Bearer " + token_result.token
+            return token_result.token
+
+    async def _get_auth_header(self) -> str:
+        """Return the cached "Bearer <token>" header value, refreshing as needed"""
+        await self._get_token()
+        return self._auth_header
+
+    def _bind_to_running_loop(self):
+        """Rebuild loop-bound state when the running event loop has changed
+
+        app.py drives each chat message through its own asyncio.run() loop
+        while this skill persists in st.session_state. The pooled session,
+        locks and semaphore bind to the loop they were created under; reused
+        on the next loop they die with "Event loop is closed" or "bound to a
+        different event loop", so they are recreated on loop change.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        if self._session is not None and not self._session.closed:
+            # The previous loop is gone, so the session cannot be closed
+            # cleanly anymore - dropping it lets the OS reclaim the sockets
+            self.logger.debug("Event loop changed - discarding pooled session from previous loop")
+        self._loop = loop
+        self._session = None
+        self._session_lock = asyncio.Lock()
+        self._token_lock = asyncio.Lock()
+        self._request_semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._inflight = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared pooled aiohttp session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    connector = aiohttp.TCPConnector(limit=32, limit_per_host=16, ttl_dns_cache=300, keepalive_timeout=75)
+                    # Graph compresses JSON 5-10x when asked; aiohttp's default
+                    # auto_decompress=True transparently inflates the body
+                    self._session = aiohttp.ClientSession(
+                        connector=connector,
+                        headers={"Accept-Encoding": "gzip, deflate"},
+                    )
+        return self._session
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after=None) -> float:
+        """Backoff delay for a throttled request - honors Retry-After when present"""
+        if retry_after:
+            try:
+                return float(retry_after)
+            except (TypeError, ValueError):
+                pass
+        return (2 ** attempt) * 0.25 + random.uniform(0, 0.25)
+
+    async def _with_retry(self, coro_factory, max_retries: int = 5):
+        """Run an SDK Graph call, absorbing transient 429/503 throttling
+
+        coro_factory is called per attempt (coroutines are single-use).
+        Non-throttling errors propagate immediately.
+        """
+        for attempt in range(max_retries):
+            try:
+                return await coro_factory()
+            except ODataError as e:
+                status = getattr(e, 'response_status_code', None)
+                if status not in (429, 503) or attempt == max_retries - 1:
+                    raise
+                headers = getattr(e, 'response_headers', None) or {}
+                delay = self._retry_delay(attempt, headers.get("Retry-After"))
+                self.logger.warning(f"Graph throttled ({status}), retrying in {delay:.2f}s (attempt {attempt + 1}/{max_retries})")
+                await asyncio.sleep(delay)
+
     @kernel_function(
-        description="Execute a Microsoft Graph API request using the official SDK",
+        description="Execute Microsoft Graph API requests using the official SDK",
         name="execute_graph_request"
     )
-    async def execute_graph_request(self, api_path: str, fetch_all: bool = False, consistency_level: str = None) -> str:
+    async def execute_graph_request(
+        self,
+        api_path: str,
+        method: str = "GET",
+        fetch_all: bool = False,
+        consistency_level: str = None,
+        query_params: dict = None,
+        body: dict = None
+    ) -> str:
         """
         Execute a Graph API request using the Microsoft Graph SDK
-        
+
         Args:
-            api_path: The API path (e.g., '/users', '/identity/conditionalAccess/policies')
+            api_path: The API path (e.g., '/users', '/identity/conditionalAccess/policies');
+                a JSON array of paths fans out concurrently and returns a result list
+            method: HTTP method (GET, POST, PUT, PATCH, DELETE)
             fetch_all: Whether to automatically fetch all pages (default: False)
             consistency_level: ConsistencyLevel header value (default: None, but 'eventual' for advanced queries)
+            query_params: Additional query parameters dict, merged into api_path
+            body: Request body for POST/PUT/PATCH
+        """
+        self._bind_to_running_loop()
+
+        # Fan-out: a list of paths (or a JSON array string, which is what the
+        # LLM can actually emit) runs the requests concurrently - independent
+        # round-trips overlap, capped by the shared request semaphore
+        if isinstance(api_path, str) and api_path.lstrip().startswith("["):
+            try:
+                api_path = _loads(api_path)
+            except ValueError:
+                pass
+        if isinstance(api_path, list):
+            results = await asyncio.gather(
+                *[self.execute_graph_request(path, method, fetch_all, consistency_level, query_params, body) for path in api_path],
+                return_exceptions=True
+            )
+            return _dumps([
+                {"api_path": path, "result": str(result) if isinstance(result, BaseException) else result}
+                for path, result in zip(api_path, results)
+            ])
+
+        self.logger.info(f"Graph API: {method} {api_path}")
+        # Lazy %s formatting - no string work unless debug logging is enabled
+        self.logger.debug("execute_graph_request called with api_path=%s, method=%s, fetch_all=%s, consistency_level=%s",
+                          api_path, method, fetch_all, consistency_level)
+
+        # Normalize once up front - every downstream consumer (cache keys,
+        # dispatch, REST fallback) then works on the same canonical strings
+        method = method.upper()
+        api_path = api_path.lstrip('/')
+
+        # Fold separately passed query params into the path so every
+        # downstream handler sees one canonical URL. urlsplit/parse_qsl do
+        # one C-level pass and keep existing percent-encodings intact.
+        if query_params:
+            parts = urlsplit(api_path)
+            merged = dict(parse_qsl(parts.query, keep_blank_values=True))
+            merged.update(query_params)
+            api_path = f"{parts.path}?{urlencode(merged)}"
+
+        if method == "GET":
+            cache_key = (api_path, fetch_all, consistency_level)
+            cached = self._response_cache.get(cache_key)
+            if cached and cached[0] > time.time():
+                self.logger.info(f"Response cache hit for {api_path}")
+                return cached[1]
+
+            response_data = await self._single_flight_get(api_path, fetch_all, consistency_level)
+        else:
+            # Writes bypass the route table and single-flight dedup - they
+            # must hit the wire exactly once each - and invalidate cached
+            # reads of the touched entity
+            self._invalidate_cache(api_path)
+            response_data = await self._fallback_rest_request(
+                api_path, consistency_level, method=method, body=body
+            )
+
+        # Errors stay unwrapped pure JSON so callers can parse them
+        if isinstance(response_data, dict) and "error" in response_data:
+            return _dumps(response_data)
+
+        # Format result (like Lokka's text formatting, but compact JSON -
+        # the consumer is an LLM that pays tokens for indentation whitespace)
+        result_text = f"Result for Graph API v1.0 - {method} {api_path}:\n\n"
+        result_text += _dumps(response_data)
+
+        # Add pagination note for single page GET (like Lokka)
+        if not fetch_all and method == "GET" and isinstance(response_data, dict) and response_data.get("@odata.nextLink"):
+            result_text += "\n\nNote: More results available. Use fetch_all=true to retrieve all pages."
+
+        if method == "GET":
+            self._store_in_cache(cache_key, api_path, result_text)
+
+        return result_text
+
+    def _cache_ttl_for(self, api_path: str) -> int:
+        """TTL in seconds for a GET path, by entity volatility"""
+        path = api_path.lstrip('/')
+        for prefix, ttl in self._cache_ttls.items():
+            if path.startswith(prefix):
+                return ttl
+        return self._default_cache_ttl
+
+    def _store_in_cache(self, cache_key, api_path: str, result_text: str):
+        """Cache a successful GET response under its TTL"""
+        now = time.time()
+        if len(self._response_cache) >= 256:
+            # Drop expired entries; clear completely if still oversized
+            expired = [k for k, v in self._response_cache.items() if v[0] <= now]
+            for k in expired:
+                del self._response_cache[k]
+            if len(self._response_cache) >= 256:
+                self._response_cache.clear()
+        self._response_cache[cache_key] = (now + self._cache_ttl_for(api_path), result_text)
+
+    def _invalidate_cache(self, api_path: str):
+        """Drop cached GETs whose path shares the written entity's first segment"""
+        segment = _path_head(api_path)
+        if not segment:
+            return
+        stale = [key for key in self._response_cache if key[0].startswith(segment)]
+        for key in stale:
+            del self._response_cache[key]
+
+    @kernel_function(
+        description="Execute several Microsoft Graph API requests in one round-trip via the $batch endpoint",
+        name="batch_execute"
+    )
+    async def batch_execute(self, requests: str) -> str:
         """
+        Execute multiple Graph API requests as one JSON batch
+
+        Args:
+            requests: JSON list of {"id", "method", "url"} sub-requests.
+                      Graph allows 20 per batch; larger lists are chunked.
+        """
+        self._bind_to_running_loop()
+
+        try:
+            batch_requests = _loads(requests) if isinstance(requests, str) else requests
+        except ValueError as e:
+            return _dumps({"error": f"Invalid batch request JSON: {str(e)}"})
+
+        if not isinstance(batch_requests, list):
+            return _dumps({"error": "Batch requests must be a JSON list"})
+
+        # Default ids and methods so callers can pass bare {"url": ...} items
+        for index, item in enumerate(batch_requests):
+            if not isinstance(item, dict):
+                return _dumps({"error": f"Batch request at index {index} must be a JSON object with a 'url'"})
+            item.setdefault("id", str(index))
+            item.setdefault("method", "GET")
+
+        responses = await self._graph_batch(batch_requests)
+
+        # Preserve request order; every entry carries its sub-request status
+        # so the caller can tell a failure from an empty success
+        results = []
+        for item in batch_requests:
+            entry = responses.get(item["id"]) or {"status": 0, "error": "No response received"}
+            results.append({"id": item["id"], **entry})
+        return _dumps(results)
+
+    async def _single_flight_get(self, api_path: str, fetch_all: bool = False, consistency_level: str = None) -> dict:
+        """Deduplicate concurrent identical GET requests onto one Graph round-trip
+
+        When the LLM fans out several identical skill calls, concurrent
+        callers await the request already on the wire.
+        """
+        key = (api_path, fetch_all, consistency_level)
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._execute_request(api_path, fetch_all, consistency_level)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            # BaseException includes CancelledError: if the originating task
+            # is cancelled the future must still be resolved, or concurrent
+            # callers shielded on it above would hang forever
+            future.set_exception(e)
+            # Mark the exception retrieved - waiters still get it re-raised
+            # on await, but a waiterless future won't log noise at GC time
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _execute_request(self, api_path: str, fetch_all: bool = False, consistency_level: str = None) -> dict:
+        """Execute a single Graph API GET request (see execute_graph_request)"""
         self.logger.info(f"Executing Graph API request: {api_path}, fetch_all={fetch_all}, consistency_level={consistency_level}")
         
         try:
@@ -51,172 +661,47 @@ class GraphAPIRequestSkill:
                 api_path = api_path[1:]
             
             # Auto-detect need for ConsistencyLevel header
-            needs_consistency = (
-                "$count" in api_path or 
-                "$filter" in api_path or 
-                "$search" in api_path or 
-                "$orderby" in api_path or
-                "conditionalAccess" in api_path
-            )
-            
+            needs_consistency = bool(_NEEDS_CONSISTENCY.search(api_path))
+
             if needs_consistency and not consistency_level:
                 consistency_level = "eventual"
                 self.logger.info(f"Auto-setting ConsistencyLevel to 'eventual' for advanced query: {api_path}")
             
-            # Log request details
-            request_log = {
-                "timestamp": datetime.now().isoformat(),
-                "method": "GET",
-                "api_path": api_path,
-                "fetch_all": fetch_all,
-                "consistency_level": consistency_level,
-                "sdk_version": "msgraph-sdk"
-            }
-            
-            # Build request using Graph SDK
-            # Start with the client and navigate to the correct endpoint
-            if api_path == "users/$count":
-                # Special handling for user count - use REST fallback for simplicity
-                headers = {}
-                if consistency_level:
-                    headers["ConsistencyLevel"] = consistency_level
-                
-                # Get access token
-                token_result = await self._credential.get_token("https://graph.microsoft.com/.default")
-                
-                # Make direct REST call
-                import aiohttp
-                request_headers = {
-                    "Authorization": f"Bearer {token_result.token}",
-                    "Content-Type": "application/json"
-                }
-                request_headers.update(headers)
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.get("https://graph.microsoft.com/v1.0/users/$count", headers=request_headers) as response:
-                        if response.status == 200:
-                            count_value = int(await response.text())
-                            result = {
-                                "count": count_value,
-                                "message": f"Total count: {count_value}"
-                            }
-                        else:
-                            error_text = await response.text()
-                            result = {
-                                "error": f"Count request failed: {response.status}",
-                                "details": error_text
-                            }
-                
-            elif api_path.startswith("users"):
-                # Users endpoint
-                if fetch_all:
-                    # Fetch all users with pagination
-                    all_users = []
-                    users_response = await self.graph_client.users.get()
-                    
-                    if users_response and users_response.value:
-                        all_users.extend(users_response.value)
-                        
-                        # Handle pagination
-                        while users_response.odata_next_link:
-                            users_response = await self.graph_client.users.with_url(
-                                users_response.odata_next_link
-                            ).get()
-                            if users_response and users_response.value:
-                                all_users.extend(users_response.value)
-                    
-                    result = {
-                        "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#users",
-                        "value": [self._serialize_user(user) for user in all_users]
-                    }
-                else:
-                    # Single page
-                    users_response = await self.graph_client.users.get()
-                    result = {
-                        "@odata.context": users_response.odata_context if users_response else None,
-                        "value": [self._serialize_user(user) for user in (users_response.value or [])]
-                    }
-                    if users_response and users_response.odata_next_link:
-                        result["@odata.nextLink"] = users_response.odata_next_link
-                        
-            elif "conditionalAccess/policies" in api_path:
-                # Conditional Access Policies - simple approach
-                try:
-                    # Use the conditional access policies endpoint directly
-                    ca_response = await self.graph_client.identity.conditional_access.policies.get()
-                    self.logger.info(f"CA Response type: {type(ca_response)}")
-                    self.logger.info(f"CA Response attributes: {dir(ca_response) if ca_response else 'None'}")
-                    
-                    if ca_response:
-                        # Check for different possible attribute names
-                        policies = None
-                        odata_context = None
-                        
-                        # Try different attribute variations
-                        if hasattr(ca_response, 'value'):
-                            policies = ca_response.value
-                        elif hasattr(ca_response, 'policies'):
-                            policies = ca_response.policies
-                        elif isinstance(ca_response, list):
-                            policies = ca_response
-                        
-                        # Try different context attribute names
-                        if hasattr(ca_response, 'odata_context'):
-                            odata_context = ca_response.odata_context
-                        elif hasattr(ca_response, '@odata.context'):
-                            odata_context = getattr(ca_response, '@odata.context')
-                        
-                        if policies:
-                            result = {
-                                "@odata.context": odata_context or f"https://graph.microsoft.com/v1.0/$metadata#identity/conditionalAccess/policies",
-                                "value": [self._serialize_ca_policy(policy) for policy in policies],
-                                "count": len(policies)
-                            }
-                        else:
-                            result = {
-                                "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#identity/conditionalAccess/policies",
-                                "value": [],
-                                "message": "No conditional access policies found",
-                                "debug_info": f"Response type: {type(ca_response)}, attributes: {list(vars(ca_response).keys()) if hasattr(ca_response, '__dict__') else 'No dict'}"
-                            }
-                    else:
-                        result = {
-                            "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#identity/conditionalAccess/policies",
-                            "value": [],
-                            "message": "No response received"
-                        }
-                        
-                except Exception as ca_error:
-                    self.logger.error(f"Conditional Access error: {ca_error}")
-                    # Fallback to simple result
-                    result = {
-                        "error": f"Conditional Access query failed: {str(ca_error)}",
-                        "message": "CA policies require proper permissions",
-                        "suggestion": "Check if the app has Policy.Read.All permission"
-                    }
-                
-            elif api_path.startswith("directoryRoles"):
-                # Directory Roles
-                roles_response = await self.graph_client.directory_roles.get()
-                result = {
-                    "@odata.context": roles_response.odata_context if roles_response else None,
-                    "value": [self._serialize_directory_role(role) for role in (roles_response.value or [])]
-                }
-                
+            # Request history is debug tooling - only pay for the log entry
+            # when debug logging is actually enabled
+            request_log = None
+            if self.logger.isEnabledFor(logging.DEBUG):
+                request_log = RequestLog(
+                    # time_ns avoids the localtime conversion of datetime.now()
+                    timestamp_ns=time.time_ns(),
+                    method="GET",
+                    api_path=api_path,
+                    fetch_all=fetch_all,
+                    consistency_level=consistency_level,
+                    sdk_version="msgraph-sdk"
+                )
+            
+            # Dispatch on the first path segment; anything unmatched goes
+            # through the generic fallback
+            handler = self._routes.get(_path_head(api_path))
+            if handler is None:
+                for fragment, substring_handler in self._substring_routes:
+                    if fragment in api_path:
+                        handler = substring_handler
+                        break
+            if handler is not None:
+                result = await handler(api_path, fetch_all, consistency_level)
             else:
-                # Generic fallback - try to parse the path and build request
                 result = await self._handle_generic_request(api_path, consistency_level)
-            
+
             # Update request log
-            request_log.update({
-                "status_code": 200,
-                "response_items": len(result.get("value", [])) if isinstance(result.get("value"), list) else 1
-            })
-            self.request_history.append(request_log)
-            
-            # Return formatted JSON
-            return json.dumps(result, indent=2, default=str)
-            
+            if request_log:
+                request_log.status_code = 200
+                request_log.response_items = len(result.get("value", [])) if isinstance(result.get("value"), list) else 1
+                self.request_history.append(request_log)
+
+            return result
+
         except ODataError as e:
             # Handle Graph SDK specific errors
             error_details = {
@@ -226,16 +711,15 @@ class GraphAPIRequestSkill:
                 "message": "Microsoft Graph API error",
                 "api_path": api_path
             }
-            
-            request_log.update({
-                "status_code": error_details["status_code"],
-                "error": error_details["error"]
-            })
-            self.request_history.append(request_log)
+
+            if request_log:
+                request_log.status_code = error_details["status_code"]
+                request_log.error = error_details["error"]
+                self.request_history.append(request_log)
             self.logger.error(f"Graph API OData Error: {error_details}")
-            
-            return json.dumps(error_details, indent=2)
-            
+
+            return error_details
+
         except Exception as e:
             # Handle general errors
             error_details = {
@@ -245,27 +729,218 @@ class GraphAPIRequestSkill:
                 "exception_type": type(e).__name__,
                 "api_path": api_path
             }
-            
-            request_log.update({
-                "status_code": None,
-                "error": str(e)
-            })
-            self.request_history.append(request_log)
+
+            if request_log:
+                request_log.error = str(e)
+                self.request_history.append(request_log)
             self.logger.error(f"Graph API Error: {str(e)}")
-            
-            return json.dumps(error_details, indent=2)
-    
+
+            return error_details
+
+    async def _route_user_count(self, api_path: str, fetch_all: bool, consistency_level: str) -> dict:
+        """Handle users/$count - uses the REST fallback for simplicity"""
+        headers = {}
+        if consistency_level:
+            headers["ConsistencyLevel"] = consistency_level
+
+        # Make direct REST call
+        request_headers = {**_BASE_HEADERS, "Authorization": await self._get_auth_header()}
+        request_headers.update(headers)
+
+        session = await self._get_session()
+        async with self._request_semaphore, session.get(_USER_COUNT_URL, headers=request_headers) as response:
+            # int() accepts the raw ASCII bytes directly - no str decode needed
+            body = await response.read()
+            if response.status == 200:
+                count_value = int(body)
+                return {
+                    "count": count_value,
+                    "message": f"Total count: {count_value}"
+                }
+            else:
+                return {
+                    "error": f"Count request failed: {response.status}",
+                    "details": body.decode("utf-8", errors="replace")
+                }
+
+    async def _paginate(self, request_builder, request_configuration=None):
+        """Yield response pages from a Graph collection endpoint
+
+        nextLink tokens are only known once a page returns, so pages cannot
+        be fetched fully in parallel - instead the next page is prefetched
+        while the caller processes the current one, overlapping network and
+        CPU time. request_configuration only applies to the first page;
+        nextLinks carry the query options forward themselves.
+        """
+        response = await self._with_retry(lambda: request_builder.get(request_configuration=request_configuration))
+        while response:
+            next_link = response.odata_next_link
+            next_page_task = (
+                asyncio.create_task(self._with_retry(lambda link=next_link: request_builder.with_url(link).get()))
+                if next_link else None
+            )
+            try:
+                yield response
+            except BaseException:
+                # Consumer bailed out (error or early close) while a prefetch
+                # was in flight - reap the task so it neither leaks nor logs
+                # "Task exception was never retrieved"
+                if next_page_task:
+                    next_page_task.cancel()
+                    try:
+                        await next_page_task
+                    except BaseException:
+                        pass
+                raise
+            response = await next_page_task if next_page_task else None
+
+    async def _delta_sync(self, entity: str, delta_builder, serializer, select_fields) -> list:
+        """Return the current full state of a collection via a delta query
+
+        The first sync walks the complete /delta result set; the deltaLink
+        Graph returns at the end is stored so the next sync only transfers
+        objects changed since (removals arrive as @removed annotations) and
+        merges them into the in-memory snapshot.
+        """
+        snapshot = self._delta_snapshots.setdefault(entity, {})
+        start_link = self._delta_links.get(entity)
+        if start_link is None:
+            # Initial sync: apply the same projection the serializer keeps
+            start_link = f"{_GRAPH_BASE}/{entity}/delta?" + urlencode({"$select": ",".join(select_fields)})
+
+        delta_link = None
+        async for page in self._paginate(delta_builder.with_url(start_link)):
+            for obj in (page.value or []):
+                if "@removed" in (obj.additional_data or {}):
+                    snapshot.pop(obj.id, None)
+                    continue
+                serialized = serializer(obj)
+                existing = snapshot.get(obj.id)
+                if existing is not None:
+                    # Incremental deltas carry only the changed properties;
+                    # everything else serializes as None and must not clobber
+                    # the state stored from earlier syncs
+                    existing.update({key: value for key, value in serialized.items() if value is not None})
+                else:
+                    snapshot[obj.id] = serialized
+            # Release the SDK objects for GC before the next page
+            page.value = None
+            delta_link = page.odata_delta_link or delta_link
+
+        if delta_link:
+            self._delta_links[entity] = delta_link
+        return list(snapshot.values())
+
+    async def _route_users(self, api_path: str, fetch_all: bool, consistency_level: str) -> dict:
+        """Handle the users endpoint"""
+        if api_path == "users/$count":
+            return await self._route_user_count(api_path, fetch_all, consistency_level)
+        if fetch_all:
+            # Full listings go through a delta sync: only the first one pays
+            # for the whole tenant, later ones just transfer the changes
+            serialized_users = await self._delta_sync("users", self.graph_client.users.delta, self._serialize_user, _USER_SELECT)
+
+            return {
+                "@odata.context": _CONTEXT["users"],
+                "value": serialized_users
+            }
+        else:
+            # Single page, still with the server-side projection
+            request_configuration = UsersRequestBuilder.UsersRequestBuilderGetRequestConfiguration(
+                query_parameters=UsersRequestBuilder.UsersRequestBuilderGetQueryParameters(select=_USER_SELECT)
+            )
+            users_response = await self._with_retry(lambda: self.graph_client.users.get(request_configuration=request_configuration))
+            result = {
+                "@odata.context": users_response.odata_context if users_response else None,
+                "value": [self._serialize_user(user) for user in (users_response.value or [])]
+            }
+            if users_response and users_response.odata_next_link:
+                result["@odata.nextLink"] = users_response.odata_next_link
+            return result
+
+    async def _route_conditional_access(self, api_path: str, fetch_all: bool, consistency_level: str) -> dict:
+        """Handle conditional access policies - simple approach"""
+        try:
+            # Use the conditional access policies endpoint directly, with a
+            # server-side projection onto the serialized fields
+            request_configuration = PoliciesRequestBuilder.PoliciesRequestBuilderGetRequestConfiguration(
+                query_parameters=PoliciesRequestBuilder.PoliciesRequestBuilderGetQueryParameters(select=_CA_POLICY_SELECT)
+            )
+            ca_response = await self._with_retry(lambda: self.graph_client.identity.conditional_access.policies.get(request_configuration=request_configuration))
+            self.logger.info(f"CA Response type: {type(ca_response)}")
+            self.logger.info(f"CA Response attributes: {dir(ca_response) if ca_response else 'None'}")
+
+            if ca_response:
+                # Check for different possible attribute names
+                policies = None
+                odata_context = None
+
+                # Try different attribute variations
+                if hasattr(ca_response, 'value'):
+                    policies = ca_response.value
+                elif hasattr(ca_response, 'policies'):
+                    policies = ca_response.policies
+                elif isinstance(ca_response, list):
+                    policies = ca_response
+
+                # Try different context attribute names
+                if hasattr(ca_response, 'odata_context'):
+                    odata_context = ca_response.odata_context
+                elif hasattr(ca_response, '@odata.context'):
+                    odata_context = getattr(ca_response, '@odata.context')
+
+                if policies:
+                    return {
+                        "@odata.context": odata_context or _CONTEXT["identity/conditionalAccess/policies"],
+                        "value": [self._serialize_ca_policy(policy) for policy in policies],
+                        "count": len(policies)
+                    }
+
+                result = {
+                    "@odata.context": _CONTEXT["identity/conditionalAccess/policies"],
+                    "value": [],
+                    "message": "No conditional access policies found"
+                }
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    result["debug_info"] = f"Response type: {type(ca_response)}, attributes: {list(vars(ca_response).keys()) if hasattr(ca_response, '__dict__') else 'No dict'}"
+                return result
+
+            return {
+                "@odata.context": _CONTEXT["identity/conditionalAccess/policies"],
+                "value": [],
+                "message": "No response received"
+            }
+
+        except Exception as ca_error:
+            self.logger.error(f"Conditional Access error: {ca_error}")
+            # Fallback to simple result
+            return {
+                "error": f"Conditional Access query failed: {str(ca_error)}",
+                "message": "CA policies require proper permissions",
+                "suggestion": "Check if the app has Policy.Read.All permission"
+            }
+
+    async def _route_directory_roles(self, api_path: str, fetch_all: bool, consistency_level: str) -> dict:
+        """Handle directory roles"""
+        roles_response = await self._with_retry(lambda: self.graph_client.directory_roles.get())
+        return {
+            "@odata.context": roles_response.odata_context if roles_response else None,
+            "value": [self._serialize_directory_role(role) for role in (roles_response.value or [])]
+        }
+
     def _serialize_user(self, user) -> dict:
         """Serialize a User object to dictionary"""
         if not user:
             return {}
+        user_id, display_name, upn, mail, enabled, created = _USER_FIELDS(user)
         return {
-            "id": user.id,
-            "displayName": user.display_name,
-            "userPrincipalName": user.user_principal_name,
-            "mail": user.mail,
-            "accountEnabled": user.account_enabled,
-            "createdDateTime": user.created_date_time.isoformat() if user.created_date_time else None
+            "id": user_id,
+            "displayName": display_name,
+            "userPrincipalName": upn,
+            "mail": mail,
+            "accountEnabled": enabled,
+            # datetime is handled by the JSON encoder (orjson natively, else default=str)
+            "createdDateTime": created
         }
     
     def _serialize_ca_policy(self, policy) -> dict:
@@ -290,25 +965,28 @@ class GraphAPIRequestSkill:
             else:
                 result["state"] = "unknown"
             
-            # Handle datetime attributes safely
+            # datetime attributes are handled by the JSON encoder directly
             created = getattr(policy, 'created_date_time', None)
             if created:
-                result["createdDateTime"] = created.isoformat() if hasattr(created, 'isoformat') else str(created)
-            
+                result["createdDateTime"] = created
+
             modified = getattr(policy, 'modified_date_time', None)
             if modified:
-                result["modifiedDateTime"] = modified.isoformat() if hasattr(modified, 'isoformat') else str(modified)
-            
-            # Add debug info about available attributes
-            result["debug_attributes"] = list(vars(policy).keys()) if hasattr(policy, '__dict__') else dir(policy)
+                result["modifiedDateTime"] = modified
             
+            # Attribute dump only when debug logging is on - dir() is expensive
+            # and the list bloats every serialized response otherwise
+            if self.logger.isEnabledFor(logging.DEBUG):
+                result["_debug_attrs"] = list(vars(policy).keys()) if hasattr(policy, '__dict__') else dir(policy)
+
         except Exception as e:
             self.logger.error(f"Error serializing CA policy: {e}")
             result = {
                 "error": f"Serialization failed: {str(e)}",
-                "policy_type": str(type(policy)),
-                "available_attributes": dir(policy) if policy else []
+                "policy_type": str(type(policy))
             }
+            if self.logger.isEnabledFor(logging.DEBUG):
+                result["_debug_attrs"] = dir(policy) if policy else []
         
         return result
     
@@ -316,29 +994,110 @@ class GraphAPIRequestSkill:
         """Serialize a Directory Role object to dictionary"""
         if not role:
             return {}
+        role_id, display_name, description, template_id = _DIRECTORY_ROLE_FIELDS(role)
+        return {
+            "id": role_id,
+            "displayName": display_name,
+            "description": description,
+            "roleTemplateId": template_id
+        }
+
+    def _serialize_group(self, group) -> dict:
+        """Serialize a Group object to dictionary"""
+        if not group:
+            return {}
+        group_id, display_name, description, mail, group_types = _GROUP_FIELDS(group)
+        return {
+            "id": group_id,
+            "displayName": display_name,
+            "description": description,
+            "mail": mail,
+            "groupTypes": group_types
+        }
+
+    def _serialize_application(self, app) -> dict:
+        """Serialize an Application object to dictionary
+
+        Keeps the fields the permission analysis and the LLM actually use;
+        required_resource_access is serialized recursively.
+        """
+        if not app:
+            return {}
         return {
-            "id": role.id,
-            "displayName": role.display_name,
-            "description": role.description,
-            "roleTemplateId": role.role_template_id
+            "id": app.id,
+            "app_id": app.app_id,
+            "display_name": app.display_name,
+            "sign_in_audience": app.sign_in_audience,
+            "created_date_time": self._serialize_value(app.created_date_time),
+            "required_resource_access": self._serialize_value(app.required_resource_access)
+        }
+
+    def _serialize_service_principal(self, sp) -> dict:
+        """Serialize a Service Principal object to dictionary"""
+        if not sp:
+            return {}
+        sp_id, app_id, display_name, sp_type, enabled = _SP_FIELDS(sp)
+        return {
+            "id": sp_id,
+            "app_id": app_id,
+            "display_name": display_name,
+            "service_principal_type": sp_type,
+            "account_enabled": enabled
         }
     
+    async def _route_applications(self, api_path: str, fetch_all: bool, consistency_level: str) -> dict:
+        """Route adapter for the applications handler (fetch_all unused there)
+
+        Requests carrying a query string go straight to the REST fallback:
+        their consumers (the app-permission multi-queries in kernel_builder)
+        parse Graph's raw camelCase JSON, and the SDK handler's snake_case
+        serialization would break that contract.
+        """
+        if "?" in api_path:
+            return await self._fallback_rest_request(api_path, consistency_level)
+        return await self._handle_applications_request(api_path, consistency_level)
+
+    async def _route_service_principals(self, api_path: str, fetch_all: bool, consistency_level: str) -> dict:
+        """Route adapter for the servicePrincipals handler; fetch_all paginates
+
+        Like applications, query-string requests ($filter/$select lookups from
+        kernel_builder) use the REST fallback so the caller-requested fields
+        come back with Graph's camelCase names instead of being dropped by
+        the fixed-field SDK serializer.
+        """
+        if "?" in api_path:
+            return await self._fallback_rest_request(api_path, consistency_level)
+        if fetch_all:
+            serialized_sps = []
+            request_configuration = ServicePrincipalsRequestBuilder.ServicePrincipalsRequestBuilderGetRequestConfiguration(
+                query_parameters=ServicePrincipalsRequestBuilder.ServicePrincipalsRequestBuilderGetQueryParameters(top=999)
+            )
+            async for page in self._paginate(self.graph_client.service_principals, request_configuration):
+                if page.value:
+                    serialized_sps.extend(self._serialize_service_principal(sp) for sp in page.value)
+                    page.value = None
+            return {
+                "@odata.context": _CONTEXT["servicePrincipals"],
+                "value": serialized_sps
+            }
+        return await self._handle_service_principals_request(api_path, consistency_level)
+
+    async def _route_groups(self, api_path: str, fetch_all: bool, consistency_level: str) -> dict:
+        """Route adapter for the groups handler; full listings use delta sync"""
+        if fetch_all:
+            serialized_groups = await self._delta_sync("groups", self.graph_client.groups.delta, self._serialize_group, _GROUP_SELECT)
+            return {
+                "@odata.context": _CONTEXT["groups"],
+                "value": serialized_groups
+            }
+        return await self._handle_groups_request(api_path, consistency_level)
+
     async def _handle_generic_request(self, api_path: str, consistency_level: str = None) -> dict:
-        """Handle generic API requests by parsing the path and routing to appropriate SDK methods"""
+        """Handle endpoints without a dedicated route via the REST fallback"""
         try:
             self.logger.info(f"Generic request for: {api_path}")
-            
-            # Parse the API path to determine the endpoint
-            if api_path.startswith("applications"):
-                return await self._handle_applications_request(api_path, consistency_level)
-            elif api_path.startswith("servicePrincipals"):
-                return await self._handle_service_principals_request(api_path, consistency_level)
-            elif api_path.startswith("groups"):
-                return await self._handle_groups_request(api_path, consistency_level)
-            else:
-                # Fallback to REST call for unsupported endpoints
-                return await self._fallback_rest_request(api_path, consistency_level)
-                
+            return await self._fallback_rest_request(api_path, consistency_level)
+
         except Exception as e:
             self.logger.error(f"Generic request failed for {api_path}: {e}")
             return {
@@ -359,59 +1118,56 @@ class GraphAPIRequestSkill:
             
             # Build the request
             request_builder = self.graph_client.applications
-            
+
             # Apply filters and selects
             if "$filter" in params:
-                # Note: Python SDK doesn't support $filter in the same way as JS
-                # We'll need to get all and filter client-side for now
-                apps_response = await request_builder.get()
-                
-                # Client-side filtering (simplified)
-                if apps_response and apps_response.value:
-                    filtered_apps = []
-                    filter_expr = params["$filter"]
-                    
-                    for app in apps_response.value:
-                        if self._matches_filter(app, filter_expr):
-                            # Check if this is a comprehensive permissions request
-                            if ("requiredResourceAccess" in params.get("$select", "") or 
-                                "rechte" in api_path.lower() or 
-                                "berechtigungen" in api_path.lower() or
-                                "permissions" in api_path.lower()):
-                                app_dict = await self._get_comprehensive_app_permissions(app)
-                                self.logger.info(f"Comprehensive permissions analysis completed for app: {app_dict.get('display_name', 'Unknown')}")
-                            else:
-                                app_dict = self._object_to_dict(app)
-                            
-                            # Apply $select if specified
-                            if "$select" in params:
-                                selected_fields = params["$select"].split(",")
-                                app_dict = {k: v for k, v in app_dict.items() if k in selected_fields or k in ["id", "display_name"]}
-                            
-                            filtered_apps.append(app_dict)
-                    
-                    return {
-                        "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#applications",
-                        "value": filtered_apps
-                    }
+                # Push $filter/$select down to Graph instead of fetching every
+                # application and filtering client-side
+                select_fields = params["$select"].split(",") if "$select" in params else None
+                query_parameters = ApplicationsRequestBuilder.ApplicationsRequestBuilderGetQueryParameters(
+                    filter=params["$filter"],
+                    select=select_fields,
+                    count=True
+                )
+                request_configuration = ApplicationsRequestBuilder.ApplicationsRequestBuilderGetRequestConfiguration(
+                    query_parameters=query_parameters
+                )
+                # Advanced queries ($filter + $count) require eventual consistency
+                request_configuration.headers.add("ConsistencyLevel", "eventual")
+
+                apps_response = await self._with_retry(lambda: request_builder.get(request_configuration=request_configuration))
+                matched_apps = list(apps_response.value) if apps_response and apps_response.value else []
+
+                # Check if this is a comprehensive permissions request
+                wants_permissions = ("requiredResourceAccess" in params.get("$select", "") or
+                                     "rechte" in api_path.lower() or
+                                     "berechtigungen" in api_path.lower() or
+                                     "permissions" in api_path.lower())
+
+                if wants_permissions:
+                    # One $batch round-trip resolves all service principal lookups
+                    app_dicts = await self._get_comprehensive_app_permissions_batch(matched_apps)
+                    self.logger.info(f"Comprehensive permissions analysis completed for {len(app_dicts)} app(s)")
                 else:
-                    return {
-                        "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#applications",
-                        "value": []
-                    }
+                    app_dicts = [self._object_to_dict(app) for app in matched_apps]
+
+                return {
+                    "@odata.context": _CONTEXT["applications"],
+                    "value": app_dicts
+                }
             else:
                 # Get all applications
-                apps_response = await request_builder.get()
+                apps_response = await self._with_retry(lambda: request_builder.get())
                 
                 if apps_response and apps_response.value:
                     result = {
-                        "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#applications",
+                        "@odata.context": _CONTEXT["applications"],
                         "value": [self._object_to_dict(app) for app in apps_response.value]
                     }
                     return result
                 else:
                     return {
-                        "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#applications",
+                        "@odata.context": _CONTEXT["applications"],
                         "value": []
                     }
                     
@@ -427,17 +1183,17 @@ class GraphAPIRequestSkill:
         try:
             # Similar to applications but for service principals
             request_builder = self.graph_client.service_principals
-            sps_response = await request_builder.get()
+            sps_response = await self._with_retry(lambda: request_builder.get())
             
             if sps_response and sps_response.value:
                 result = {
-                    "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#servicePrincipals",
+                    "@odata.context": _CONTEXT["servicePrincipals"],
                     "value": [self._object_to_dict(sp) for sp in sps_response.value]
                 }
                 return result
             else:
                 return {
-                    "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#servicePrincipals",
+                    "@odata.context": _CONTEXT["servicePrincipals"],
                     "value": []
                 }
                 
@@ -451,17 +1207,20 @@ class GraphAPIRequestSkill:
     async def _handle_groups_request(self, api_path: str, consistency_level: str = None) -> dict:
         """Handle groups endpoint requests"""
         try:
-            groups_response = await self.graph_client.groups.get()
+            request_configuration = GroupsRequestBuilder.GroupsRequestBuilderGetRequestConfiguration(
+                query_parameters=GroupsRequestBuilder.GroupsRequestBuilderGetQueryParameters(select=_GROUP_SELECT)
+            )
+            groups_response = await self._with_retry(lambda: self.graph_client.groups.get(request_configuration=request_configuration))
             
             if groups_response and groups_response.value:
                 result = {
-                    "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#groups",
+                    "@odata.context": _CONTEXT["groups"],
                     "value": [self._object_to_dict(group) for group in groups_response.value]
                 }
                 return result
             else:
                 return {
-                    "@odata.context": f"https://graph.microsoft.com/v1.0/$metadata#groups",
+                    "@odata.context": _CONTEXT["groups"],
                     "value": []
                 }
                 
@@ -472,41 +1231,57 @@ class GraphAPIRequestSkill:
                 "api_path": api_path
             }
     
-    async def _fallback_rest_request(self, api_path: str, consistency_level: str = None) -> dict:
-        """Fallback to REST request for endpoints not supported by SDK"""
+    async def _fallback_rest_request(self, api_path: str, consistency_level: str = None,
+                                     method: str = "GET", body: dict = None) -> dict:
+        """Fallback to REST request for endpoints and methods not supported by SDK"""
         try:
             # Build full URL
-            full_url = f"https://graph.microsoft.com/v1.0/{api_path}"
-            
-            # Get access token
-            token_result = await self._credential.get_token("https://graph.microsoft.com/.default")
+            full_url = f"{_GRAPH_BASE}/{api_path}"
             
             # Make REST request
-            import aiohttp
-            headers = {
-                "Authorization": f"Bearer {token_result.token}",
-                "Content-Type": "application/json"
-            }
-            
+            headers = {**_BASE_HEADERS, "Authorization": await self._get_auth_header()}
+
             if consistency_level:
                 headers["ConsistencyLevel"] = consistency_level
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(full_url, headers=headers) as response:
-                    response_text = await response.text()
-                    
+
+            if self.logger.isEnabledFor(logging.DEBUG):
+                safe_headers = {**_REDACTED_HEADERS}
+                if consistency_level:
+                    safe_headers["ConsistencyLevel"] = consistency_level
+                self.logger.debug(f"REST {method} {full_url} headers={safe_headers}")
+
+            session = await self._get_session()
+            max_retries = 5
+            for attempt in range(max_retries):
+                async with self._request_semaphore, session.request(method, full_url, headers=headers, json=body) as response:
+                    # Throttled - back off and retry instead of surfacing the error
+                    if response.status in (429, 503) and attempt < max_retries - 1:
+                        delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                        self.logger.warning(f"Graph throttled REST request ({response.status}), retry in {delay:.2f}s: {api_path}")
+                        await asyncio.sleep(delay)
+                        continue
+
                     if response.status >= 400:
+                        # Only the first 4KB of an error body is worth keeping -
+                        # gateway errors can be arbitrarily large HTML pages
+                        error_body = await response.content.read(4096)
                         return {
                             "error": f"REST request failed: {response.status} {response.reason}",
-                            "response_body": response_text,
+                            "response_body": error_body.decode("utf-8", errors="replace"),
                             "api_path": api_path
                         }
-                    
+
+                    # Read the body as raw bytes and hand them straight to the
+                    # JSON parser - the full str decode that response.text()
+                    # (and response.json()) would do is skipped, halving peak
+                    # memory on big user/group pages
+                    body = await response.read()
+
                     try:
-                        return json.loads(response_text)
-                    except json.JSONDecodeError:
+                        return _loads(body)
+                    except ValueError:
                         return {
-                            "raw_response": response_text,
+                            "raw_response": body.decode("utf-8", errors="replace"),
                             "api_path": api_path
                         }
                         
@@ -519,34 +1294,23 @@ class GraphAPIRequestSkill:
     
     def _parse_query_params(self, query_string: str) -> dict:
         """Parse query parameters from URL"""
-        params = {}
-        for param in query_string.split("&"):
-            if "=" in param:
-                key, value = param.split("=", 1)
-                params[key] = value.replace("%20", " ").replace("'", "'")
-        return params
-    
-    def _matches_filter(self, obj, filter_expr: str) -> bool:
-        """Simple client-side filtering (basic displayName eq support)"""
-        try:
-            if "displayName eq" in filter_expr:
-                # Extract the value from "displayName eq 'value'"
-                parts = filter_expr.split("displayName eq")
-                if len(parts) > 1:
-                    value = parts[1].strip().strip("'\"")
-                    obj_display_name = getattr(obj, 'display_name', '')
-                    return obj_display_name == value
-        except:
-            pass
-        return False
+        # parse_qsl handles all percent-encodings (the old hand-rolled split
+        # only unescaped %20) and is C-accelerated
+        return dict(parse_qsl(query_string, keep_blank_values=True))
     
     def _object_to_dict(self, obj) -> dict:
         """Convert a Graph SDK object to dictionary with deep serialization"""
         if obj is None:
             return {}
-        
+
+        # Known models get an explicit field-list serializer - much cheaper
+        # than walking dir()/getattr over every attribute
+        serializer = self._serializers.get(type(obj))
+        if serializer:
+            return serializer(obj)
+
         result = {}
-        
+
         try:
             # First, try to get the actual object attributes using vars()
             if hasattr(obj, '__dict__'):
@@ -570,175 +1334,178 @@ class GraphAPIRequestSkill:
             self.logger.error(f"Error converting object to dict: {e}")
             result = {
                 "error": f"Conversion failed: {str(e)}",
-                "object_type": str(type(obj)),
-                "available_attrs": dir(obj) if obj else []
+                "object_type": str(type(obj))
             }
+            if self.logger.isEnabledFor(logging.DEBUG):
+                result["_debug_attrs"] = dir(obj) if obj else []
         
         return result
     
+    @functools.singledispatchmethod
     def _serialize_value(self, value):
-        """Recursively serialize any value to JSON-compatible format"""
-        if value is None:
-            return None
-        elif isinstance(value, (str, int, float, bool)):
-            return value
-        elif hasattr(value, 'value'):  # Enum
-            return value.value
-        elif hasattr(value, 'isoformat'):  # DateTime
-            return value.isoformat()
-        elif isinstance(value, list):
-            return [self._serialize_value(item) for item in value]
-        elif isinstance(value, dict):
-            return {k: self._serialize_value(v) for k, v in value.items()}
-        elif hasattr(value, '__dict__'):
+        """Recursively serialize any value to JSON-compatible format
+
+        Dispatched by type via singledispatch - terminal types (str/int/...)
+        resolve through its C-level type cache instead of an isinstance/
+        hasattr ladder per value. Unregistered types fall through here.
+        """
+        if hasattr(value, '__dict__'):
             # Nested object - recurse
             return self._object_to_dict(value)
-        else:
-            # Convert to string as fallback
-            return str(value)
+        # Convert to string as fallback
+        return str(value)
+
+    @_serialize_value.register(type(None))
+    @_serialize_value.register(str)
+    @_serialize_value.register(int)
+    @_serialize_value.register(float)
+    def _serialize_scalar(self, value):
+        return value
+
+    @_serialize_value.register(enum.Enum)
+    def _serialize_enum(self, value):
+        return value.value
+
+    @_serialize_value.register(datetime)
+    def _serialize_datetime(self, value):
+        return value.isoformat()
+
+    @_serialize_value.register(list)
+    def _serialize_list(self, value):
+        return [self._serialize_value(item) for item in value]
+
+    @_serialize_value.register(dict)
+    def _serialize_dict(self, value):
+        return {k: self._serialize_value(v) for k, v in value.items()}
+
+    @_serialize_value.register(Parsable)
+    def _serialize_parsable(self, value):
+        # Graph SDK models all derive from kiota's Parsable
+        return self._object_to_dict(value)
     
+    async def _paged(self, url: str, consistency_level: str = None):
+        """Yield "value" pages from a REST collection URL, following @odata.nextLink
+
+        nextLink tokens are opaque and only known once the previous page
+        returns, so pages are chained sequentially.
+        """
+        while url:
+            response = await self._fallback_rest_request(url, consistency_level)
+            if "error" in response:
+                # Raise instead of stopping quietly - a dropped page would
+                # silently truncate the collection for the caller
+                raise RuntimeError(f"Pagination request failed: {response['error']}")
+            yield response.get("value") or []
+
+            next_link = response.get("@odata.nextLink")
+            # nextLink is absolute; the REST fallback expects a v1.0-relative path
+            url = next_link.split("/v1.0/", 1)[1] if next_link and "/v1.0/" in next_link else None
+
+    async def _graph_batch(self, batch_requests: list) -> dict:
+        """Execute multiple Graph requests in one round-trip via the /$batch endpoint
+
+        Takes a list of {"id", "method", "url"} sub-requests, chunks them to
+        Graph's limit of 20 per batch, and returns a dict mapping request id
+        to {"status", "body"} for successes or {"status", "error"} for
+        failures, so callers can distinguish the two.
+        """
+        results = {}
+        if not batch_requests:
+            return results
+
+        try:
+            headers = {**_BASE_HEADERS, "Authorization": await self._get_auth_header()}
+
+            session = await self._get_session()
+            max_retries = 5
+            for start in range(0, len(batch_requests), 20):
+                chunk = batch_requests[start:start + 20]
+                for attempt in range(max_retries):
+                    async with self._request_semaphore, session.post(
+                        _BATCH_URL,
+                        headers=headers,
+                        json={"requests": chunk}
+                    ) as response:
+                        # Throttled - back off and retry the whole chunk
+                        if response.status in (429, 503) and attempt < max_retries - 1:
+                            delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                            self.logger.warning(f"Graph throttled $batch request ({response.status}), retry in {delay:.2f}s")
+                            await asyncio.sleep(delay)
+                            continue
+
+                        response_text = await response.text()
+
+                        if response.status >= 400:
+                            self.logger.error(f"Graph $batch request failed: {response.status} {response_text[:200]}")
+                            # The whole chunk failed - record the failure for
+                            # every sub-request it carried
+                            for item in chunk:
+                                results[item.get("id")] = {
+                                    "status": response.status,
+                                    "error": f"$batch request failed: {response.status} {response.reason}"
+                                }
+                            break
+
+                        payload = _loads(response_text)
+                        for item in payload.get("responses", []):
+                            status = item.get("status", 500)
+                            if status < 400:
+                                results[item.get("id")] = {"status": status, "body": item.get("body")}
+                            else:
+                                self.logger.error(f"Graph $batch sub-request {item.get('id')} failed with status {status}")
+                                results[item.get("id")] = {"status": status, "error": item.get("body")}
+                        break
+
+        except Exception as e:
+            self.logger.error(f"Graph $batch request failed: {e}")
+
+        return results
+
     async def _get_comprehensive_app_permissions(self, app) -> dict:
         """Get comprehensive app permissions following Lokka's multi-query strategy"""
-        try:
-            app_dict = self._object_to_dict(app)
+        results = await self._get_comprehensive_app_permissions_batch([app])
+        return results[0] if results else self._object_to_dict(app)
+
+    async def _get_comprehensive_app_permissions_batch(self, apps: list) -> list:
+        """Analyze permissions for multiple apps with one $batch round-trip
+
+        Coalesces the per-app service principal lookups into a single
+        /$batch POST instead of issuing one HTTPS request per app.
+        """
+        app_dicts = [self._object_to_dict(app) for app in apps]
+
+        # Build one batch containing each app's service principal lookup
+        batch_requests = []
+        for index, app_dict in enumerate(app_dicts):
             app_id = app_dict.get('id') or app_dict.get('app_id')
-            
-            if not app_id:
-                return app_dict
-            
-            self.logger.info(f"Getting comprehensive permissions for app {app_id}")
-            
-            # Step 1: Get basic app info (already have it)
-            # Step 2: Get corresponding service principal
-            service_principal = await self._get_service_principal_for_app(app_id)
-            
-            # Step 3: Get permission mappings
-            permission_mappings = self._get_permission_mappings()
-            
-            # Step 4: Analyze required vs granted permissions
-            comprehensive_permissions = await self._analyze_app_permissions(
-                app_dict, service_principal, permission_mappings
-            )
-            
-            # Add comprehensive permission analysis to app data
-            app_dict['comprehensive_permissions'] = comprehensive_permissions
-            
-            return app_dict
-            
-        except Exception as e:
-            self.logger.error(f"Error getting comprehensive permissions: {e}")
-            app_dict = self._object_to_dict(app)
-            app_dict['permission_analysis_error'] = str(e)
-            return app_dict
-    
-    async def _get_service_principal_for_app(self, app_id: str) -> dict:
-        """Get the service principal for an application"""
-        try:
-            self.logger.info(f"Looking for service principal with appId: {app_id}")
-            
-            # Get service principal by appId using filter (more efficient)
-            url = f"servicePrincipals?$filter=appId eq '{app_id}'"
-            response = await self._fallback_rest_request(url)
-            
-            if "value" in response and response["value"]:
-                sp = response["value"][0]  # Should be unique
-                self.logger.info(f"Found service principal: {sp.get('displayName', 'Unknown')} (ID: {sp.get('id', 'Unknown')})")
-                return sp
-            else:
-                self.logger.info(f"No service principal found for appId: {app_id}")
-                return None
-            
-        except Exception as e:
-            self.logger.error(f"Error getting service principal for app {app_id}: {e}")
-            return None
+            if app_id:
+                batch_requests.append({
+                    "id": str(index),
+                    "method": "GET",
+                    "url": f"/servicePrincipals?$filter=appId eq '{app_id}'"
+                })
+
+        sp_responses = await self._graph_batch(batch_requests)
+        permission_mappings = self._get_permission_mappings()
+
+        for index, app_dict in enumerate(app_dicts):
+            try:
+                sp_body = (sp_responses.get(str(index)) or {}).get("body") or {}
+                sp_values = sp_body.get("value") or []
+                service_principal = sp_values[0] if sp_values else None
+
+                app_dict['comprehensive_permissions'] = await self._analyze_app_permissions(
+                    app_dict, service_principal, permission_mappings
+                )
+            except Exception as e:
+                self.logger.error(f"Error getting comprehensive permissions: {e}")
+                app_dict['permission_analysis_error'] = str(e)
+
+        return app_dicts
     
     def _get_permission_mappings(self) -> dict:
-        """Get permission GUID to human-readable name mappings"""
-        # Microsoft Graph API permissions (most common ones)
-        microsoft_graph_permissions = {
-            # User permissions (from your data)
-            "e1fe6dd8-ba31-4d61-89e7-88639da4683d": "User.Read",
-            "b340eb25-3456-403f-be2f-af7a0d370277": "User.ReadBasic.All",
-            "df021288-bdef-4463-88db-98f22de89214": "User.Read.All",
-            "204e0828-b5ca-4ad8-b9f3-f32a958e7cc4": "User.ReadWrite.All",
-            
-            # Directory permissions (from your data)
-            "7ab1d382-f21e-4acd-a863-ba3e13f7da61": "Directory.Read.All",
-            "5b567255-7703-4780-807c-7be8301ae99b": "Directory.ReadWrite.All",
-            "483bed4a-2ad3-4361-a73b-c83ccdbdc53c": "Directory.AccessAsUser.All",
-            "06da0dbc-49e2-44d2-8312-53f166ab848a": "Directory.Read.All",
-            "c5366453-9fb0-48a5-a156-24f0c49a4b84": "Directory.ReadWrite.All",
-            
-            # Group permissions (from your data)
-            "5f8c59db-677d-491f-a6b8-5f174b11ec1d": "Group.Read.All", 
-            "62a82d76-70ea-41e2-9197-370581804d09": "Group.ReadWrite.All",
-            "5b567255-7703-4780-807c-7be8301ae99b": "Group.Read.All",  # Alternative ID
-            "4e46008b-f24c-477d-8fff-7bb4ec7aafe0": "Group.ReadWrite.All",
-            
-            # Application permissions (from your data)
-            "9a5d68dd-52b0-4cc2-bd40-abcf44ac3a30": "Application.Read.All",
-            "1bfefb4e-e0b5-418b-a88f-73c46d2cc8e9": "Application.Read.All",
-            "1cda74f2-2616-4834-b122-5cb1b07f8a59": "Application.ReadWrite.All",
-            
-            # Policy permissions (from your data)
-            "246dd0d5-5bd0-4def-940b-0421030a5b68": "Policy.Read.All",
-            
-            # Device permissions (from your data)
-            "06a5fe6d-c49d-46a7-b082-56b1b14103c7": "Device.Read.All",
-            "230c1aed-a721-4c5d-9cb4-a90514e508ef": "Device.Command",
-            "7438b122-aefc-4978-80ed-43db9fcc7715": "Device.Read.All",
-            "1138cb37-bd11-4084-a2b7-9f71582aeddb": "Device.ReadWrite.All",
-            
-            # Device Management (Intune) permissions (from your data)
-            "dc377aa6-52d8-4e23-b271-2a7ae04cedf3": "DeviceManagementManagedDevices.Read.All",
-            "b0afded3-3588-46d8-8b3d-9842eff778da": "DeviceManagementManagedDevices.ReadWrite.All",
-            
-            # Mail permissions
-            "810c84a8-4a9e-49e6-bf7d-12d183f40d01": "Mail.Read",
-            "693c5e45-0940-467d-9b8a-1022fb9d42ef": "Mail.ReadWrite",
-            "75359482-378d-4052-8f01-80520e7db3cd": "Mail.Read.Shared",
-            
-            # Calendar permissions
-            "465a38f9-76ea-45b9-9f34-9e8b0d4b0b42": "Calendars.Read",
-            "1ec239c2-d7c9-4623-a91a-a9775856bb36": "Calendars.ReadWrite",
-            
-            # Files permissions
-            "df85f4d6-205c-4ac5-a5ea-6bf408dba283": "Files.Read.All",
-            "75359482-378d-4052-8f01-80520e7db3cd": "Files.ReadWrite.All",
-            
-            # Sites permissions
-            "332a536c-c7ef-4017-ab91-336970924f0d": "Sites.Read.All",
-            "9492366f-7969-46a4-8d15-ed1a20078fff": "Sites.ReadWrite.All",
-            
-            # Policy permissions
-            "246dd0d5-5bd0-4def-940b-0421030a5b68": "Policy.Read.All",
-            "40b534c3-9552-4550-901b-23879c90bcf9": "Policy.ReadWrite.ConditionalAccess",
-            
-            # Reports permissions
-            "230c1aed-a721-4c5d-9cb4-a90514e508ef": "Reports.Read.All",
-            
-            # Device permissions
-            "7438b122-aefc-4978-80ed-43db9fcc7715": "Device.Read.All",
-            "1138cb37-bd11-4084-a2b7-9f71582aeddb": "Device.ReadWrite.All",
-        }
-        
-        # Azure Active Directory Graph permissions (legacy, but still used)
-        aad_graph_permissions = {
-            "5778995a-e1bf-45b8-affa-663a9f3f4d04": "Directory.Read.All",
-            "78c8a3c8-a07e-4b9e-af1b-b5ccab50a175": "Directory.ReadWrite.All",
-            "824c81eb-e3f8-4ee6-8f6d-de7f50d565b7": "Application.ReadWrite.OwnedBy",
-        }
-        
-        return {
-            "00000003-0000-0000-c000-000000000000": {  # Microsoft Graph
-                "name": "Microsoft Graph",
-                "permissions": microsoft_graph_permissions
-            },
-            "00000002-0000-0000-c000-000000000000": {  # Azure Active Directory Graph
-                "name": "Azure Active Directory Graph",
-                "permissions": aad_graph_permissions
-            }
-        }
+        """Get permission GUID to human-readable name mappings (shared module-level table)"""
+        return _PERMISSION_MAPPINGS
     
     async def _analyze_app_permissions(self, app_dict: dict, service_principal: dict, permission_mappings: dict) -> dict:
         """Analyze app permissions in Lokka style - required vs granted with human-readable names"""
@@ -797,11 +1564,60 @@ class GraphAPIRequestSkill:
             if service_principal:
                 sp_id = service_principal.get('id')
                 if sp_id:
-                    # Get app role assignments (application permissions)
-                    app_role_assignments = await self._get_app_role_assignments(sp_id)
-                    # Get OAuth2 permission grants (delegated permissions)
-                    oauth2_grants = await self._get_oauth2_permission_grants(sp_id)
-                    
+                    # App role assignments (application permissions) and OAuth2
+                    # grants (delegated) go to Graph as one $batch round-trip
+                    grant_responses = await self._graph_batch([
+                        {
+                            "id": "roles",
+                            "method": "GET",
+                            "url": f"/servicePrincipals/{sp_id}/appRoleAssignments"
+                        },
+                        {
+                            "id": "grants",
+                            "method": "GET",
+                            # $select trims each grant to the fields the matcher
+                            # reads; the advanced-query combination needs
+                            # ConsistencyLevel: eventual for complete results
+                            "url": (f"/oauth2PermissionGrants?$filter=clientId eq '{sp_id}'"
+                                    "&$select=clientId,resourceId,scope,consentType&$count=true&$top=999"),
+                            "headers": {"ConsistencyLevel": "eventual"}
+                        }
+                    ])
+                    roles_entry = grant_responses.get("roles") or {}
+                    grants_entry = grant_responses.get("grants") or {}
+
+                    # A failed lookup must not read as "zero granted
+                    # permissions" - report the failure instead of a
+                    # seemingly successful empty analysis
+                    failures = [
+                        f"{key} lookup failed (status {entry.get('status')}): {entry.get('error') or 'no response'}"
+                        for key, entry in (("roles", roles_entry), ("grants", grants_entry))
+                        if "body" not in entry
+                    ]
+                    if failures:
+                        analysis["permission_analysis_error"] = "; ".join(failures)
+                        return analysis
+
+                    roles_body = roles_entry.get("body") or {}
+                    grants_body = grants_entry.get("body") or {}
+                    app_role_assignments = roles_body.get("value") or []
+                    oauth2_grants = grants_body.get("value") or []
+
+                    # Batch sub-responses are single pages - follow any
+                    # nextLink so grants beyond the default page size are
+                    # not silently dropped. The grants continuation is part
+                    # of an advanced query and keeps ConsistencyLevel:
+                    # eventual; a failed page raises out of _paged and is
+                    # reported by the except below.
+                    for body, items, consistency in (
+                        (roles_body, app_role_assignments, None),
+                        (grants_body, oauth2_grants, "eventual"),
+                    ):
+                        next_link = body.get("@odata.nextLink")
+                        if next_link and "/v1.0/" in next_link:
+                            async for page in self._paged(next_link.split("/v1.0/", 1)[1], consistency):
+                                items.extend(page)
+
                     # Match granted permissions with required permissions
                     self._match_granted_permissions(analysis, app_role_assignments, oauth2_grants, permission_mappings)
             else:
@@ -817,36 +1633,6 @@ class GraphAPIRequestSkill:
                 "granted_permissions": []
             }
     
-    async def _get_app_role_assignments(self, service_principal_id: str) -> list:
-        """Get app role assignments for a service principal (application permissions)"""
-        try:
-            # Use REST fallback for appRoleAssignments as SDK might not have direct support
-            url = f"servicePrincipals/{service_principal_id}/appRoleAssignments"
-            response = await self._fallback_rest_request(url)
-            
-            if "value" in response:
-                return response["value"]
-            return []
-            
-        except Exception as e:
-            self.logger.error(f"Error getting app role assignments: {e}")
-            return []
-    
-    async def _get_oauth2_permission_grants(self, service_principal_id: str) -> list:
-        """Get OAuth2 permission grants for a service principal (delegated permissions)"""
-        try:
-            # Get OAuth2 permission grants where clientId matches our service principal
-            url = f"oauth2PermissionGrants?$filter=clientId eq '{service_principal_id}'"
-            response = await self._fallback_rest_request(url)
-            
-            if "value" in response:
-                return response["value"]
-            return []
-            
-        except Exception as e:
-            self.logger.error(f"Error getting OAuth2 permission grants: {e}")
-            return []
-    
     def _match_granted_permissions(self, analysis: dict, app_role_assignments: list, oauth2_grants: list, permission_mappings: dict):
         """Match granted permissions with required permissions and update analysis"""
         try:
@@ -859,71 +1645,74 @@ class GraphAPIRequestSkill:
                 app_role_id = assignment.get('appRoleId')
                 
                 if resource_id and app_role_id:
-                    # Find the API this permission belongs to
-                    for api_id, api_info in permission_mappings.items():
-                        if app_role_id in api_info["permissions"]:
-                            permission_name = api_info["permissions"][app_role_id]
-                            granted_app_permissions.add((api_info["name"], permission_name, app_role_id))
-                            break
-            
-            # Process OAuth2 permission grants (delegated permissions)
+                    # O(1) reverse-index lookup for the API this permission
+                    # belongs to (index keys are GUIDs as ints)
+                    try:
+                        entry = _ID_TO_API_PERM.get(UUID(app_role_id).int)
+                    except ValueError:
+                        entry = None
+                    if entry:
+                        granted_app_permissions.add((entry[0], entry[1], app_role_id))
+            
+            # Process OAuth2 permission grants (delegated permissions). Scope
+            # strings repeat the same names across grants, so collect the
+            # distinct set first and resolve each name once via the index.
+            granted_scope_names = set()
             for grant in oauth2_grants:
                 resource_id = grant.get('resourceId')
                 scope = grant.get('scope', '')
-                
+
                 if resource_id and scope:
                     # Scope contains space-separated permission names
-                    scopes = scope.split(' ') if scope else []
-                    
-                    # Find the API this permission belongs to
-                    for api_id, api_info in permission_mappings.items():
-                        for scope_name in scopes:
-                            # Look for the scope name in our permission mappings
-                            for perm_id, perm_name in api_info["permissions"].items():
-                                if perm_name == scope_name:
-                                    granted_delegated_permissions.add((api_info["name"], perm_name, perm_id))
-                                    break
-            
-            # Update required permissions to mark which ones are granted
+                    granted_scope_names.update(scope.split(' '))
+
+            for scope_name in granted_scope_names:
+                # The name index yields every API that defines this permission
+                for api_name, perm_name, perm_id in _NAME_TO_API_PERM.get(scope_name, ()):
+                    granted_delegated_permissions.add((api_name, perm_name, perm_id))
+            
+            # Update required permissions to mark which ones are granted.
+            # Direct set membership on ids and (api, name) pairs replaces a
+            # scan of the granted set per required permission.
+            granted_app_ids = {gid for _, _, gid in granted_app_permissions}
+            granted_app_names = {(gapi, gname) for gapi, gname, _ in granted_app_permissions}
+            granted_delegated_ids = {gid for _, _, gid in granted_delegated_permissions}
+            granted_delegated_names = {(gapi, gname) for gapi, gname, _ in granted_delegated_permissions}
+
             for req_perm in analysis["required_permissions"]:
-                perm_id = req_perm["permission_id"]
-                perm_type = req_perm["type"]
-                api_name = req_perm["api"]
-                perm_name = req_perm["permission_name"]
-                
-                if perm_type == "Application":
-                    # Check if this app permission is granted
-                    for granted_api, granted_name, granted_id in granted_app_permissions:
-                        if granted_id == perm_id or (granted_api == api_name and granted_name == perm_name):
-                            req_perm["granted"] = True
-                            break
+                if req_perm["type"] == "Application":
+                    granted_ids, granted_names = granted_app_ids, granted_app_names
                 else:  # Delegated
-                    # Check if this delegated permission is granted
-                    for granted_api, granted_name, granted_id in granted_delegated_permissions:
-                        if granted_id == perm_id or (granted_api == api_name and granted_name == perm_name):
-                            req_perm["granted"] = True
-                            break
-            
-            # Create granted permissions list
-            analysis["granted_permissions"] = []
+                    granted_ids, granted_names = granted_delegated_ids, granted_delegated_names
+
+                if (req_perm["permission_id"] in granted_ids or
+                        (req_perm["api"], req_perm["permission_name"]) in granted_names):
+                    req_perm["granted"] = True
             
-            for api_name, perm_name, perm_id in granted_app_permissions:
-                analysis["granted_permissions"].append({
+            # Create granted permissions list. One membership set replaces a
+            # linear scan of required_permissions per granted permission.
+            required_ids = {rp["permission_id"] for rp in analysis["required_permissions"]}
+
+            analysis["granted_permissions"] = [
+                {
                     "api": api_name,
                     "permission_name": perm_name,
                     "permission_id": perm_id,
                     "type": "Application",
-                    "required": any(rp["permission_id"] == perm_id for rp in analysis["required_permissions"])
-                })
-            
-            for api_name, perm_name, perm_id in granted_delegated_permissions:
-                analysis["granted_permissions"].append({
+                    "required": perm_id in required_ids
+                }
+                for api_name, perm_name, perm_id in granted_app_permissions
+            ]
+            analysis["granted_permissions"].extend(
+                {
                     "api": api_name,
                     "permission_name": perm_name,
                     "permission_id": perm_id,
                     "type": "Delegated",
-                    "required": any(rp["permission_id"] == perm_id for rp in analysis["required_permissions"])
-                })
+                    "required": perm_id in required_ids
+                }
+                for api_name, perm_name, perm_id in granted_delegated_permissions
+            )
             
             # Update summary
             analysis["permission_summary"]["total_granted"] = len(analysis["granted_permissions"])